@@ -1,17 +1,35 @@
 import os
 from fastapi import FastAPI,Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException as StarletteHTTPException
 from starlette.middleware.base import BaseHTTPMiddleware
 
 import logging
 import uvicorn
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager
 from datetime import datetime
 
+from services import ToneStore
+from controllers.tone_controller import ToneController
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Build shared state when the server starts instead of at import time,
+    # keeping cold start cheap and letting tests inject their own controller.
+    # The process pool runs CPU-bound evaluation scoring outside the GIL.
+    app.state.store = ToneStore()
+    app.state.pool = ProcessPoolExecutor(max_workers=os.cpu_count())
+    app.state.controller = ToneController(app.state.store, pool=app.state.pool)
+    yield
+    app.state.pool.shutdown(wait=False)
+
+
+# orjson serializes responses several times faster than the stdlib encoder
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
 
 # Middleware for CORS
 app.add_middleware(
@@ -35,4 +53,15 @@ async def main_route():
 
 # Run the app
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    # uvloop + httptools roughly double event-loop/parsing throughput.
+    # WEB_CONCURRENCY opts into multiple workers; it defaults to 1 because
+    # per-process state (batcher queues, fallback store) is not shared.
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=8000,
+        loop="uvloop",
+        http="httptools",
+        workers=int(os.getenv("WEB_CONCURRENCY", "1")),
+        log_level="warning",
+    )
\ No newline at end of file
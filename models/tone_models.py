@@ -1,7 +1,11 @@
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, Field, field_validator
 from typing import Optional, List, Dict
 from enum import Enum
 
+# Hoisted out of the validators: built once, O(1) membership checks
+_VALID_TONES = frozenset({'formal', 'casual', 'friendly', 'professional', 'authoritative', 'warm', 'direct'})
+_VALID_ADDRESS_STYLES = frozenset({'direct', 'indirect', 'personal', 'impersonal', 'collective'})
+
 class ToneLevel(str, Enum):
     FORMAL = "formal"
     SEMI_FORMAL = "semi-formal"
@@ -28,19 +32,21 @@ class ToneCharacteristics(BaseModel):
     address_style: str = Field(..., description="Forms of address (e.g., direct, indirect, personal)")
     emotional_appeal: EmotionalAppeal = Field(..., description="Type of emotional appeal")
     
-    @validator('tone')
+    @field_validator('tone')
+    @classmethod
     def validate_tone(cls, v):
-        valid_tones = ['formal', 'casual', 'friendly', 'professional', 'authoritative', 'warm', 'direct']
-        if v.lower() not in valid_tones:
-            raise ValueError(f'Tone must be one of: {", ".join(valid_tones)}')
-        return v.lower()
-    
-    @validator('address_style')
+        v = v.lower()
+        if v not in _VALID_TONES:
+            raise ValueError(f'Tone must be one of: {", ".join(sorted(_VALID_TONES))}')
+        return v
+
+    @field_validator('address_style')
+    @classmethod
     def validate_address_style(cls, v):
-        valid_styles = ['direct', 'indirect', 'personal', 'impersonal', 'collective']
-        if v.lower() not in valid_styles:
-            raise ValueError(f'Address style must be one of: {", ".join(valid_styles)}')
-        return v.lower()
+        v = v.lower()
+        if v not in _VALID_ADDRESS_STYLES:
+            raise ValueError(f'Address style must be one of: {", ".join(sorted(_VALID_ADDRESS_STYLES))}')
+        return v
 
 class BrandInfo(BaseModel):
     brand_id: str = Field(..., description="Unique brand identifier")
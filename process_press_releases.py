@@ -1,45 +1,79 @@
-from services.tone_service import process_word_document, analyze_tone, rewrite_with_signature, evaluate_tone
+from services.tone_service import (
+    build_word_document_collection,
+    open_collection,
+    analyze_tone_async,
+    rewrite_with_signature_async,
+    evaluate_tone_async,
+)
+from services.classify import extract_features, classify_tones, TONE_LABELS
+from collections import Counter
+import asyncio
 import os
+from concurrent.futures import ProcessPoolExecutor
+from glob import glob
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
-def main():
-    # Process the press releases document
-    print("Processing Press Releases document...")
-    vectorstore = process_word_document("Press Releases Examples.docx")
-    
-    # Get all documents from the vectorstore
-    documents = vectorstore.get()
-    
+# Size of the text windows analyzed concurrently
+ANALYSIS_WINDOW_CHARS = 4000
+
+def _combined_text(vectorstore):
+    """Join all stored chunks of a vectorstore into one string"""
+    # Chroma.get() returns a dict of columns; the texts live under "documents"
+    return " ".join(vectorstore.get()["documents"])
+
+async def main():
+    # Process every press-release document in parallel; docx parsing is
+    # CPU-bound, so a process pool scales it across cores. Workers return
+    # collection names — vectorstores hold sqlite handles and locks that
+    # cannot be pickled back — and the parent reopens the persisted data
+    docx_paths = glob("*.docx") or ["Press Releases Examples.docx"]
+    print(f"Processing {len(docx_paths)} press release document(s)...")
+    with ProcessPoolExecutor() as executor:
+        collection_names = list(executor.map(build_word_document_collection, docx_paths))
+    vectorstores = [open_collection(name) for name in collection_names]
+
     # Combine all texts for analysis
-    combined_text = " ".join([doc.page_content for doc in documents])
-    
-    # Analyze the tone
+    combined_text = " ".join(_combined_text(vs) for vs in vectorstores)
+
+    # Analyze the tone, fanning out over fixed-size windows so large
+    # corpora do not serialize into one giant LLM call
     print("\nAnalyzing tone of voice...")
-    signature = analyze_tone(combined_text)
+    windows = [
+        combined_text[i:i + ANALYSIS_WINDOW_CHARS]
+        for i in range(0, len(combined_text), ANALYSIS_WINDOW_CHARS)
+    ] or [combined_text]
+    # Bulk-classify the windows with the compiled kernel instead of a
+    # Python loop per document
+    codes = classify_tones(extract_features(windows))
+    distribution = Counter(TONE_LABELS[code] for code in codes)
+    print(f"Tone distribution across {len(windows)} window(s): {dict(distribution)}")
+
+    signatures = await asyncio.gather(*(analyze_tone_async(w) for w in windows))
+    signature = "\n".join(signatures)
     print("\nBrand Voice Signature:")
     print(signature)
-    
+
     # Example of rewriting a new text with the signature
     example_text = """
     We are excited to announce our new product launch. This innovative solution will help businesses streamline their operations and increase efficiency.
     """
-    
+
     print("\nExample of rewriting text with the brand voice:")
     print("\nOriginal text:")
     print(example_text)
-    
-    rewritten = rewrite_with_signature(example_text, signature)
+
+    rewritten = await rewrite_with_signature_async(example_text, signature)
     print("\nRewritten text:")
     print(rewritten)
-    
+
     # Evaluate the rewritten text
     print("\nEvaluating the rewritten text...")
-    evaluation = evaluate_tone(example_text, rewritten, signature)
+    evaluation = await evaluate_tone_async(example_text, rewritten, signature)
     print("\nEvaluation:")
     print(evaluation)
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    asyncio.run(main())
@@ -1,4 +1,19 @@
 from .cache_service import CacheService
-from .tone_service import analyze_tone, rewrite_with_signature, evaluate_tone
+from .store import ToneStore
+from .tone_service import (
+    analyze_tone,
+    rewrite_with_signature,
+    evaluate_tone,
+    process_word_document,
+    analyze_press_releases,
+)
 
-__all__ = ['CacheService', 'analyze_tone', 'rewrite_with_signature', 'evaluate_tone'] 
\ No newline at end of file
+__all__ = [
+    'CacheService',
+    'ToneStore',
+    'analyze_tone',
+    'rewrite_with_signature',
+    'evaluate_tone',
+    'process_word_document',
+    'analyze_press_releases',
+] 
\ No newline at end of file
@@ -0,0 +1,96 @@
+import asyncio
+from typing import Any, Callable, List
+
+from .tone_service import (
+    analyze_tone_batch,
+    rewrite_with_signature_batch,
+    evaluate_tone_batch,
+)
+
+
+class Batcher:
+    """Coalesce concurrent calls into a single batched upstream LLM call.
+
+    Callers submit individual payloads and await a future; a background
+    task drains up to max_batch items (or waits max_wait_ms for more),
+    issues one batched call, and resolves each caller's future with its
+    own result. This amortizes the per-call RPC and prompt-prefix cost
+    across a burst of concurrent requests.
+    """
+
+    def __init__(self, batch_fn: Callable[[List[Any]], List[Any]],
+                 max_batch: int = 16, max_wait_ms: int = 20):
+        self.batch_fn = batch_fn
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue: asyncio.Queue = None
+        self._worker: asyncio.Task = None
+
+    async def submit(self, payload):
+        """Submit one payload and wait for its result from the next batch"""
+        self._ensure_worker()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((payload, future))
+        return await future
+
+    def _ensure_worker(self):
+        # Lazily start the drain task on the running loop
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._drain())
+
+    async def _drain(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            # Block for the first item, then collect more until the batch
+            # is full or the wait window closes
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            # Drop entries whose futures were cancelled while queued, so a
+            # speculative submit that lost its race does not trigger a paid
+            # upstream call for a result nobody will read
+            batch = [(payload, future) for payload, future in batch if not future.done()]
+            if not batch:
+                continue
+
+            payloads = [payload for payload, _ in batch]
+            try:
+                # Batch functions are async (one awaited upstream call); sync
+                # ones are pushed off the event loop
+                if asyncio.iscoroutinefunction(self.batch_fn):
+                    results = await self.batch_fn(payloads)
+                else:
+                    results = await asyncio.to_thread(self.batch_fn, payloads)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+            # A short result list would strand the zipped-out callers on
+            # futures that never resolve; fail them instead
+            for _, future in batch[len(results):]:
+                if not future.done():
+                    future.set_exception(
+                        RuntimeError("batched call returned fewer results than payloads")
+                    )
+
+
+# One batcher per service function, shared across requests
+analyze_batcher = Batcher(analyze_tone_batch)
+rewrite_batcher = Batcher(rewrite_with_signature_batch)
+evaluate_batcher = Batcher(evaluate_tone_batch)
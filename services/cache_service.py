@@ -1,119 +1,185 @@
-from functools import lru_cache
 from typing import Optional, Dict, Any
+from collections import Counter
+from itertools import islice
 import hashlib
-from datetime import datetime, timedelta
+import math
 import threading
+import time
+
+from cachetools import TTLCache
+
+# Number of lock stripes; a power of two so _shard can mask instead of mod
+_SHARD_COUNT = 16
+_MAX_ENTRIES = 10_000
+
+
+class _VLRUCache(TTLCache):
+    """TTLCache with hit-aware capacity eviction.
+
+    When full, instead of dropping the single least-recent entry, the
+    oldest ~10% are sampled and the one with the fewest recorded hits is
+    evicted, so frequently re-used entries survive long-tail traffic.
+    Expired removals are counted opportunistically as they are encountered.
+    """
+
+    def __init__(self, maxsize, ttl, **kwargs):
+        super().__init__(maxsize, ttl, **kwargs)
+        self._hit_counts = Counter()
+        self.expired_evictions = 0
+
+    def __getitem__(self, key):
+        value = super().__getitem__(key)
+        self._hit_counts[key] += 1
+        return value
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._hit_counts.pop(key, None)
+
+    def expire(self, time=None):
+        removed = super().expire(time)
+        if removed:
+            self.expired_evictions += len(removed)
+            # TTLCache deletes expired entries through the base class, so
+            # the subclass __delitem__ never sees them; prune their hit
+            # counts here or the Counter grows with every key ever cached
+            for key, _ in removed:
+                self._hit_counts.pop(key, None)
+        return removed
+
+    def popitem(self):
+        sample_size = max(1, math.ceil(self.maxsize * 0.1))
+        sample = list(islice(iter(self), sample_size))
+        if not sample:
+            return super().popitem()
+        victim = min(sample, key=lambda k: math.log(self._hit_counts[k] + 1))
+        return victim, self.pop(victim)
 
 class CacheService:
     def __init__(self):
         """Initialize the cache service with in-memory cache"""
-        # In-memory cache with thread safety
-        self._cache = {}
-        self._lock = threading.Lock()
-        
         # Default expiry time (1 hour)
         self.default_expiry = 3600  # seconds
-        
-    def _generate_key(self, prefix: str, data: str) -> str:
-        """Generate a unique cache key"""
-        # Create a hash of the data to ensure consistent keys
-        data_hash = hashlib.md5(data.encode()).hexdigest()
-        return f"{prefix}:{data_hash}"
-    
-    def _is_expired(self, timestamp: datetime) -> bool:
-        """Check if a cache entry is expired"""
-        return datetime.now() > timestamp + timedelta(seconds=self.default_expiry)
-    
-    @lru_cache(maxsize=1000)
+
+        # The cache is striped across independent TTLCaches, each with its
+        # own lock, so concurrent lookups for unrelated keys do not
+        # serialize on one mutex. TTLCache handles expiry and LRU eviction.
+        # Expiry runs on the monotonic clock, immune to wall-clock jumps
+        self._shards = [
+            _VLRUCache(
+                maxsize=_MAX_ENTRIES // _SHARD_COUNT,
+                ttl=self.default_expiry,
+                timer=time.monotonic
+            )
+            for _ in range(_SHARD_COUNT)
+        ]
+        self._locks = [threading.Lock() for _ in range(_SHARD_COUNT)]
+
+        # Hit/miss counters for get_cache_stats
+        self._hits = 0
+        self._misses = 0
+
+    def _generate_key(self, prefix: str, data) -> str:
+        """Generate a unique cache key from str or bytes data"""
+        # BLAKE2b is faster than MD5 and 8 bytes is plenty for internal keys
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        return f"{prefix}:{hashlib.blake2b(data, digest_size=8).hexdigest()}"
+
+    @staticmethod
+    def content_key(text) -> bytes:
+        """Hash text once into a compact key callers can reuse across caches"""
+        if isinstance(text, str):
+            text = text.encode('utf-8')
+        return hashlib.blake2b(text, digest_size=8).digest()
+
+    @staticmethod
+    def composite_key(*parts) -> bytes:
+        """Hash several str/bytes parts incrementally into one key.
+
+        Feeds blake2b piecewise with a 0x1f separator after each part, so
+        no concatenated string is materialized and part boundaries cannot
+        collide.
+        """
+        h = hashlib.blake2b(digest_size=8)
+        for part in parts:
+            if isinstance(part, str):
+                part = part.encode('utf-8')
+            h.update(part)
+            h.update(b"\x1f")
+        return h.digest()
+
+    def get_by_key(self, prefix: str, key: bytes) -> Optional[Dict]:
+        """Look up a precomputed content key without re-hashing the text"""
+        return self._get(f"{prefix}:{key.hex()}")
+
+    def put_by_key(self, prefix: str, key: bytes, value: Dict):
+        """Store a value under a precomputed content key"""
+        self._set(f"{prefix}:{key.hex()}", value)
+
+    def _shard(self, cache_key: str):
+        """Return the (lock, cache) stripe owning this key"""
+        index = hash(cache_key) & (_SHARD_COUNT - 1)
+        return self._locks[index], self._shards[index]
+
+    def _get(self, cache_key: str) -> Optional[Dict]:
+        lock, shard = self._shard(cache_key)
+        with lock:
+            data = shard.get(cache_key)
+            if data is not None:
+                self._hits += 1
+            else:
+                self._misses += 1
+            return data
+
+    def _set(self, cache_key: str, value: Dict):
+        lock, shard = self._shard(cache_key)
+        with lock:
+            shard[cache_key] = value
+
     def get_cached_analysis(self, text: str) -> Optional[Dict]:
         """Get cached analysis results"""
-        cache_key = self._generate_key("analysis", text)
-        
-        with self._lock:
-            if cache_key in self._cache:
-                entry = self._cache[cache_key]
-                if not self._is_expired(entry['timestamp']):
-                    return entry['data']
-                else:
-                    del self._cache[cache_key]
-            
-        return None
-    
+        return self._get(self._generate_key("analysis", text))
+
     def cache_analysis(self, text: str, analysis: Dict):
         """Cache analysis results"""
-        cache_key = self._generate_key("analysis", text)
-        
-        with self._lock:
-            self._cache[cache_key] = {
-                'data': analysis,
-                'timestamp': datetime.now()
-            }
-        
-        # Update LRU cache
-        self.get_cached_analysis.cache_clear()  # Clear old cache
-        self.get_cached_analysis(text)  # Add to cache
-    
-    @lru_cache(maxsize=1000)
+        self._set(self._generate_key("analysis", text), analysis)
+
     def get_cached_evaluation(self, eval_key: str) -> Optional[Dict]:
         """Get cached evaluation results"""
-        cache_key = self._generate_key("evaluation", eval_key)
-        
-        with self._lock:
-            if cache_key in self._cache:
-                entry = self._cache[cache_key]
-                if not self._is_expired(entry['timestamp']):
-                    return entry['data']
-                else:
-                    del self._cache[cache_key]
-            
-        return None
-    
+        return self._get(self._generate_key("evaluation", eval_key))
+
     def cache_evaluation(self, eval_key: str, evaluation: Dict):
         """Cache evaluation results"""
-        cache_key = self._generate_key("evaluation", eval_key)
-        
-        with self._lock:
-            self._cache[cache_key] = {
-                'data': evaluation,
-                'timestamp': datetime.now()
-            }
-        
-        # Update LRU cache
-        self.get_cached_evaluation.cache_clear()  # Clear old cache
-        self.get_cached_evaluation(eval_key)  # Add to cache
-    
+        self._set(self._generate_key("evaluation", eval_key), evaluation)
+
     def get_cache_stats(self) -> Dict[str, Any]:
-        """Get cache statistics"""
-        with self._lock:
-            current_time = datetime.now()
-            expired_count = sum(
-                1 for entry in self._cache.values()
-                if self._is_expired(entry['timestamp'])
-            )
-            
-            return {
-                "cache_size": len(self._cache),
-                "expired_entries": expired_count,
-                "lru_cache_size": self.get_cached_analysis.cache_info().currsize,
-                "lru_cache_hits": self.get_cached_analysis.cache_info().hits,
-                "lru_cache_misses": self.get_cached_analysis.cache_info().misses
-            }
-    
+        """Get cache statistics aggregated across shards"""
+        size = 0
+        expired = 0
+        for lock, shard in zip(self._locks, self._shards):
+            with lock:
+                size += len(shard)
+                expired += shard.expired_evictions
+        return {
+            "cache_size": size,
+            "expired_entries": expired,
+            "hits": self._hits,
+            "misses": self._misses
+        }
+
     def clear_cache(self, prefix: Optional[str] = None):
         """Clear cache entries"""
-        with self._lock:
-            if prefix:
-                # Clear specific prefix
-                keys_to_delete = [
-                    key for key in self._cache.keys()
-                    if key.startswith(f"{prefix}:")
-                ]
-                for key in keys_to_delete:
-                    del self._cache[key]
-            else:
-                # Clear all cache
-                self._cache.clear()
-        
-        # Clear LRU cache
-        self.get_cached_analysis.cache_clear()
-        self.get_cached_evaluation.cache_clear() 
\ No newline at end of file
+        for lock, shard in zip(self._locks, self._shards):
+            with lock:
+                if prefix:
+                    # Clear specific prefix
+                    keys_to_delete = [
+                        key for key in shard.keys()
+                        if key.startswith(f"{prefix}:")
+                    ]
+                    for key in keys_to_delete:
+                        del shard[key]
+                else:
+                    # Clear all cache
+                    shard.clear()
\ No newline at end of file
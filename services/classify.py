@@ -0,0 +1,56 @@
+import re
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional; the NumPy path is still vectorized
+    njit = None
+
+# Classification codes returned by classify_tones
+SEMI_FORMAL, FORMAL, CASUAL = 0, 1, 2
+TONE_LABELS = {SEMI_FORMAL: "semi-formal", FORMAL: "formal", CASUAL: "casual"}
+
+# Marker terms mirroring the formality heuristics used elsewhere
+_FORMAL_RE = re.compile(r"\b(please|kindly|regarding|concerning|accordingly|therefore|thus|hence)\b", re.IGNORECASE)
+_CASUAL_RE = re.compile(r"\b(hey|hi|hello|thanks|cheers|great|awesome|cool|just|actually|basically)\b", re.IGNORECASE)
+
+
+def extract_features(texts) -> np.ndarray:
+    """Build a (n_texts, 2) feature matrix of formal/casual marker counts"""
+    features = np.empty((len(texts), 2), dtype=np.float64)
+    for i, text in enumerate(texts):
+        features[i, 0] = len(_FORMAL_RE.findall(text))
+        features[i, 1] = len(_CASUAL_RE.findall(text))
+    return features
+
+
+def _classify_kernel(features):
+    # Plain arithmetic per row so numba can compile this to native code
+    n = features.shape[0]
+    out = np.empty(n, dtype=np.int64)
+    for i in range(n):
+        formal = features[i, 0]
+        casual = features[i, 1]
+        if formal > casual * 2:
+            out[i] = FORMAL
+        elif casual > formal * 2:
+            out[i] = CASUAL
+        else:
+            out[i] = SEMI_FORMAL
+    return out
+
+
+if njit is not None:
+    classify_tones = njit(cache=True, fastmath=True)(_classify_kernel)
+    # Warm the JIT with a dummy row so the first real request does not pay
+    # compilation latency
+    classify_tones(np.zeros((1, 2), dtype=np.float64))
+else:
+    def classify_tones(features: np.ndarray) -> np.ndarray:
+        """Vectorized NumPy fallback when numba is not installed"""
+        formal = features[:, 0]
+        casual = features[:, 1]
+        return np.where(
+            formal > casual * 2, FORMAL,
+            np.where(casual > formal * 2, CASUAL, SEMI_FORMAL)
+        )
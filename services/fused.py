@@ -0,0 +1,84 @@
+from langchain.chains import LLMChain
+from langchain.llms import OpenAI
+from langchain.prompts import PromptTemplate
+import json
+
+from .cache_service import CacheService
+from .tone_service import _content_hash
+
+# Shared cache so a repeated (text, signature) pair skips the LLM entirely
+_fused_cache = CacheService()
+
+# One prompt that rewrites and scores in a single round trip, instead of a
+# rewrite call followed by an evaluation call over the same content
+fused_prompt = PromptTemplate.from_template("""
+Rewrite this text to reflect the following tone signature, then score your own
+rewrite against that signature.
+
+Signature:
+{signature}
+
+Text:
+{text}
+
+Return ONLY a JSON object with these keys:
+- "rewritten": the rewritten text
+- "fluency": number from 0 to 1
+- "authenticity": number from 0 to 1
+- "tone_alignment": number from 0 to 1
+- "readability": number from 0 to 1
+- "overall_score": number from 0 to 1
+- "strengths": list of short strings
+- "suggestions": list of short strings
+""")
+
+_SCORE_FIELDS = ("fluency", "authenticity", "tone_alignment", "readability", "overall_score")
+_LIST_FIELDS = ("strengths", "suggestions")
+
+
+def _parse_fused_result(raw: str):
+    """Extract the JSON object from the model output, or None when malformed"""
+    start = raw.find("{")
+    end = raw.rfind("}")
+    if start == -1 or end <= start:
+        return None
+    try:
+        parsed = json.loads(raw[start:end + 1])
+    except json.JSONDecodeError:
+        return None
+    if not isinstance(parsed, dict) or "rewritten" not in parsed:
+        return None
+    scores = {}
+    for field in _SCORE_FIELDS:
+        if field in parsed:
+            # Drop scores the model emitted as non-numeric values rather
+            # than letting the conversion error escape the parser
+            try:
+                scores[field] = float(parsed[field])
+            except (TypeError, ValueError):
+                continue
+    for field in _LIST_FIELDS:
+        if isinstance(parsed.get(field), list):
+            scores[field] = [str(item) for item in parsed[field]]
+    return {"rewritten": str(parsed["rewritten"]), "scores": scores}
+
+
+#rewrite_and_score
+async def rewrite_and_score(text: str, signature: str) -> dict:
+    """Rewrite text against a signature and score the result in one LLM call.
+
+    Returns {"rewritten": str, "scores": dict}; scores holds only the fields
+    the model produced, so callers can overlay them onto default results.
+    """
+    key = _content_hash(text, signature, "fused")
+    cached = _fused_cache.get_cached_evaluation(key)
+    if cached is not None:
+        return cached
+    chain = LLMChain(llm=OpenAI(temperature=0.7), prompt=fused_prompt)
+    raw = await chain.arun({"text": text, "signature": signature})
+    result = _parse_fused_result(raw)
+    if result is None:
+        # Malformed JSON: keep the raw output as the rewrite, with no scores
+        result = {"rewritten": raw.strip(), "scores": {}}
+    _fused_cache.cache_evaluation(key, result)
+    return result
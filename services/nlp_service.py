@@ -0,0 +1,271 @@
+import spacy
+import nltk
+from nltk.corpus import stopwords
+from nltk.stem import WordNetLemmatizer
+from sentence_transformers import SentenceTransformer
+from typing import Dict, List, Tuple
+import numpy as np
+from collections import Counter
+from functools import lru_cache
+import os
+import re
+
+# Optional int8 ONNX backend for the sentence encoder; point
+# MINILM_ONNX_DIR at a quantized optimum-cli export to enable it
+try:
+    from optimum.onnxruntime import ORTModelForFeatureExtraction
+    from transformers import AutoTokenizer
+except ImportError:
+    ORTModelForFeatureExtraction = None
+
+_ONNX_MODEL_DIR = os.getenv("MINILM_ONNX_DIR")
+
+# Download required NLTK data
+nltk.download('stopwords')
+nltk.download('wordnet')
+nltk.download('averaged_perceptron_tagger')
+
+
+class _OnnxSentenceEncoder:
+    """Drop-in encode() over an int8 ONNX export of the sentence model"""
+
+    def __init__(self, model_dir: str):
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        self.model = ORTModelForFeatureExtraction.from_pretrained(model_dir)
+
+    def encode(self, texts: List[str], batch_size: int = 64, convert_to_numpy: bool = True,
+               normalize_embeddings: bool = False, show_progress_bar: bool = False) -> np.ndarray:
+        outputs = []
+        for start in range(0, len(texts), batch_size):
+            batch = texts[start:start + batch_size]
+            inputs = self.tokenizer(batch, padding=True, truncation=True, return_tensors="np")
+            hidden = self.model(**inputs).last_hidden_state
+            # Mean-pool over real tokens only
+            mask = inputs["attention_mask"][..., None].astype(hidden.dtype)
+            summed = (hidden * mask).sum(axis=1)
+            counts = np.clip(mask.sum(axis=1), 1e-9, None)
+            outputs.append(summed / counts)
+        embeddings = np.concatenate(outputs) if outputs else np.zeros((0, 384), dtype=np.float32)
+        if normalize_embeddings:
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            embeddings = embeddings / np.clip(norms, 1e-12, None)
+        return embeddings
+
+
+def _load_sentence_encoder():
+    """Prefer the quantized ONNX encoder when configured, else stock FP32"""
+    if ORTModelForFeatureExtraction is not None and _ONNX_MODEL_DIR and os.path.isdir(_ONNX_MODEL_DIR):
+        return _OnnxSentenceEncoder(_ONNX_MODEL_DIR)
+    return SentenceTransformer('all-MiniLM-L6-v2')
+
+class NLPService:
+    def __init__(self):
+        """Initialize the NLP service with required models and resources"""
+        self.nlp = spacy.load("en_core_web_sm")
+        self.stop_words = set(stopwords.words('english'))
+        self.lemmatizer = WordNetLemmatizer()
+        self.sentence_transformer = _load_sentence_encoder()
+
+        # Tone patterns
+        self.patterns = {
+            'formal': [
+                r'\b(please|kindly|would you|could you)\b',
+                r'\b(regarding|concerning|with respect to)\b',
+                r'\b(accordingly|therefore|thus|hence)\b'
+            ],
+            'casual': [
+                r'\b(hey|hi|hello|thanks|cheers)\b',
+                r'\b(great|awesome|cool|nice)\b',
+                r'\b(just|actually|basically|literally)\b'
+            ],
+            'professional': [
+                r'\b(implement|develop|create|establish)\b',
+                r'\b(strategy|solution|approach|methodology)\b',
+                r'\b(optimize|enhance|improve|streamline)\b'
+            ]
+        }
+
+        # Emotional lexicon inverted once into lemma -> category, so the
+        # appeal scan is a single dict probe per token
+        emotional_words = {
+            'rational': ['because', 'therefore', 'thus', 'consequently'],
+            'emotional': ['feel', 'believe', 'hope', 'wish'],
+            'inspirational': ['achieve', 'succeed', 'excel', 'inspire'],
+            'humorous': ['funny', 'amusing', 'entertaining', 'witty']
+        }
+        self._emotional_categories = tuple(emotional_words)
+        self._emotional_lemmas = {
+            lemma: category
+            for category, lemmas in emotional_words.items()
+            for lemma in lemmas
+        }
+
+        # Union each tone's alternatives into one pattern compiled once, so
+        # _recognize_patterns makes a single pass per tone instead of three
+        # re.findall calls with per-call cache lookups
+        self._compiled_patterns = {
+            tone: re.compile("|".join(f"(?:{p})" for p in pats), re.IGNORECASE)
+            for tone, pats in self.patterns.items()
+        }
+
+        # Per-instance memo so analyze_text and get_tone_characteristics on
+        # the same text share one spaCy parse and one tokenization pass
+        self._artifacts = lru_cache(maxsize=256)(self._compute_artifacts)
+
+        # Characteristics repeat within a request pipeline; memoize the
+        # assembled dict so repeats cost a dict lookup, not three doc walks
+        self._characteristics_memo = lru_cache(maxsize=256)(self._compute_tone_characteristics)
+
+    def _compute_artifacts(self, text: str) -> Tuple:
+        """Run the expensive parses for a text exactly once"""
+        # The spaCy doc already carries sentence boundaries, tokens and
+        # stop-word flags, so no separate NLTK tokenization pass is needed
+        doc = self.nlp(text)
+        sentences = [sent.text for sent in doc.sents]
+        return doc, sentences
+
+    def analyze_text(self, text: str) -> Dict:
+        """Perform comprehensive NLP analysis on the text"""
+        doc, sentences = self._artifacts(text)
+        return {
+            'statistics': self._get_text_statistics(doc, sentences),
+            'linguistic_features': self._analyze_linguistic_features(doc),
+            'patterns': self._recognize_patterns(text),
+            'semantic_analysis': self._analyze_semantics(text, sentences)
+        }
+
+    def _get_text_statistics(self, doc, sentences: List[str]) -> Dict:
+        """Get basic text statistics from the parsed doc"""
+        word_count = len(doc)
+        return {
+            'sentence_count': len(sentences),
+            'word_count': word_count,
+            'unique_words': len({token.text for token in doc}),
+            'avg_sentence_length': word_count / len(sentences) if sentences else 0,
+            'stop_word_ratio': sum(1 for token in doc if token.is_stop) / word_count if word_count else 0
+        }
+
+    def _analyze_linguistic_features(self, doc) -> Dict:
+        """Analyze linguistic features from a parsed spaCy doc"""
+        # Part-of-speech analysis
+        pos_counts = Counter([token.pos_ for token in doc])
+
+        # Named entity recognition
+        entities = [(ent.text, ent.label_) for ent in doc.ents]
+
+        # Dependency parsing
+        dependencies = [(token.text, token.dep_) for token in doc]
+
+        return {
+            'pos_distribution': dict(pos_counts),
+            'entities': entities,
+            'dependencies': dependencies,
+            'noun_phrases': [chunk.text for chunk in doc.noun_chunks]
+        }
+
+    def _recognize_patterns(self, text: str) -> Dict:
+        """Recognize tone patterns in the text"""
+        pattern_matches = {}
+
+        for tone, regex in self._compiled_patterns.items():
+            # Each alternative keeps its capture group, so findall yields
+            # tuples with one non-empty entry per match
+            matches = [group for found in regex.findall(text) for group in found if group]
+            pattern_matches[tone] = list(set(matches))
+
+        return pattern_matches
+
+    def _analyze_semantics(self, text: str, sentences: List[str]) -> Dict:
+        """Perform semantic analysis on pre-split sentences"""
+        doc, _ = self._artifacts(text)
+        phrases = [chunk.text for chunk in doc.noun_chunks if len(chunk.text.split()) > 1]
+
+        # One model invocation covers sentences and phrases, paying the
+        # per-call overhead once; normalized output keeps the similarity
+        # computations plain matmuls
+        embeddings = self.sentence_transformer.encode(
+            sentences + phrases,
+            batch_size=64,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+            show_progress_bar=False
+        )
+        sent_embeddings = embeddings[:len(sentences)]
+        phrase_embeddings = embeddings[len(sentences):]
+
+        similarity_matrix = sent_embeddings @ sent_embeddings.T
+
+        # Identify key phrases
+        key_phrases = self._extract_key_phrases(phrases, phrase_embeddings, sent_embeddings)
+
+        return {
+            'sentence_similarity': similarity_matrix.tolist(),
+            'key_phrases': key_phrases,
+            'semantic_coherence': float(np.mean(similarity_matrix))
+        }
+
+    def _extract_key_phrases(self, phrases: List[str], phrase_embeddings: np.ndarray,
+                             sent_embeddings: np.ndarray) -> List[str]:
+        """Pick the phrases most similar to the text overall; embeddings must be L2-normalized"""
+        if phrases:
+            # Score every phrase against every sentence in one matmul
+            importance_scores = (phrase_embeddings @ sent_embeddings.T).mean(axis=1)
+
+            # Select the top k in O(n) with argpartition, then order just
+            # those k best-first instead of sorting every phrase
+            k = min(5, len(importance_scores))
+            top_indices = np.argpartition(importance_scores, -k)[-k:]
+            top_indices = top_indices[np.argsort(importance_scores[top_indices])[::-1]]
+            return [phrases[i] for i in top_indices]
+
+        return []
+
+    def get_tone_characteristics(self, text: str) -> Dict:
+        """Extract tone characteristics from the text"""
+        return self._characteristics_memo(text)
+
+    def _compute_tone_characteristics(self, text: str) -> Dict:
+        # Reuses the parse cached by analyze_text for the same text
+        doc, _ = self._artifacts(text)
+        patterns = self._recognize_patterns(text)
+
+        return {
+            'formality_level': self._calculate_formality(doc, patterns),
+            'emotional_appeal': self._analyze_emotional_appeal(doc),
+            'language_style': self._analyze_language_style(doc, patterns),
+            'detected_patterns': patterns
+        }
+
+    def _calculate_formality(self, doc, patterns: Dict) -> str:
+        """Calculate the formality level of the text"""
+        formal_markers = len(patterns.get('formal', []))
+        casual_markers = len(patterns.get('casual', []))
+
+        if formal_markers > casual_markers * 2:
+            return 'formal'
+        elif casual_markers > formal_markers * 2:
+            return 'casual'
+        else:
+            return 'semi-formal'
+
+    def _analyze_emotional_appeal(self, doc) -> str:
+        """Analyze the emotional appeal of the text"""
+        word_counts = {category: 0 for category in self._emotional_categories}
+
+        for token in doc:
+            category = self._emotional_lemmas.get(token.lemma_.lower())
+            if category is not None:
+                word_counts[category] += 1
+
+        return max(word_counts.items(), key=lambda x: x[1])[0]
+
+    def _analyze_language_style(self, doc, patterns: Dict) -> str:
+        """Analyze the language style of the text"""
+        professional_markers = len(patterns.get('professional', []))
+
+        if professional_markers > 3:
+            return 'professional'
+        elif any(token.pos_ == 'NOUN' and token.is_stop == False for token in doc):
+            return 'technical'
+        else:
+            return 'conversational'
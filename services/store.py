@@ -0,0 +1,100 @@
+import os
+import json
+import time
+import asyncio
+from typing import Optional, Dict, Tuple, Any
+
+try:
+    from redis import asyncio as aioredis
+except ImportError:  # redis is optional; fall back to in-process storage
+    aioredis = None
+
+
+class ToneStore:
+    """Shared store for brand info, signatures and evaluations.
+
+    Backed by Redis when REDIS_URL is configured so state survives restarts
+    and is shared across uvicorn workers; otherwise falls back to a process
+    local dict. Hot reads are served from a bounded TTL cache so repeated
+    lookups skip the round-trip to Redis.
+    """
+
+    def __init__(self, redis_url: Optional[str] = None,
+                 cache_maxsize: int = 10_000, cache_ttl: int = 300):
+        redis_url = redis_url or os.getenv("REDIS_URL")
+        if aioredis is not None and redis_url:
+            self._redis = aioredis.from_url(redis_url, decode_responses=True)
+        else:
+            self._redis = None
+
+        # Fallback storage when Redis is not configured
+        self._local: Dict[str, str] = {}
+
+        # Bounded read-through cache: key -> (value, expires_at)
+        self._cache: Dict[str, Tuple[Any, float]] = {}
+        self._cache_maxsize = cache_maxsize
+        self._cache_ttl = cache_ttl
+        self._lock = asyncio.Lock()
+
+    async def _cache_get(self, key: str):
+        async with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if time.monotonic() < expires_at:
+                    return value
+                del self._cache[key]
+        return None
+
+    async def _cache_put(self, key: str, value):
+        async with self._lock:
+            if len(self._cache) >= self._cache_maxsize:
+                # Evict the oldest entries to stay bounded
+                for old_key in list(self._cache)[:self._cache_maxsize // 10]:
+                    del self._cache[old_key]
+            self._cache[key] = (value, time.monotonic() + self._cache_ttl)
+
+    async def _get(self, key: str) -> Optional[Dict]:
+        cached = await self._cache_get(key)
+        if cached is not None:
+            return cached
+
+        if self._redis is not None:
+            raw = await self._redis.get(key)
+        else:
+            raw = self._local.get(key)
+        if raw is None:
+            return None
+
+        value = json.loads(raw)
+        await self._cache_put(key, value)
+        return value
+
+    async def _set(self, key: str, value: Dict):
+        raw = json.dumps(value)
+        if self._redis is not None:
+            await self._redis.set(key, raw)
+        else:
+            self._local[key] = raw
+        await self._cache_put(key, value)
+
+    # Brand information
+    async def get_brand(self, brand_id: str) -> Optional[Dict]:
+        return await self._get(f"brand:{brand_id}")
+
+    async def set_brand(self, brand_id: str, brand_info: Dict):
+        await self._set(f"brand:{brand_id}", brand_info)
+
+    # Brand signatures
+    async def get_signature(self, brand_id: str) -> Optional[Dict]:
+        return await self._get(f"signature:{brand_id}")
+
+    async def set_signature(self, brand_id: str, signature_data: Dict):
+        await self._set(f"signature:{brand_id}", signature_data)
+
+    # Evaluations
+    async def get_eval(self, eval_id: str) -> Optional[Dict]:
+        return await self._get(f"evaluation:{eval_id}")
+
+    async def set_eval(self, eval_id: str, eval_data: Dict):
+        await self._set(f"evaluation:{eval_id}", eval_data)
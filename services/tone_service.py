@@ -6,14 +6,28 @@ from langchain_openai import OpenAIEmbeddings
 from langchain.document_loaders import TextLoader
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from dotenv import load_dotenv
+import hashlib
 import os
 from docx import Document
 from typing import List
 
+from .cache_service import CacheService
+
 
 load_dotenv()
 os.environ["OPENAI_API_KEY"] =os.getenv("OPENAI_API_KEY")
 
+# Shared content-addressed cache so identical inputs skip the LLM entirely
+_llm_cache = CacheService()
+
+def _content_hash(*parts: str) -> str:
+    """Build a stable cache key from one or more text parts"""
+    h = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        h.update(part.encode())
+        h.update(b"\x1f")
+    return h.hexdigest()
+
 
 # Prompts
 signature_prompt = PromptTemplate.from_template("""
@@ -57,20 +71,118 @@ Rewritten:
 """)
 
 #analyze tone
-def analyze_tone(text:str): 
+def analyze_tone(text:str):
+    key = _content_hash(text)
+    cached = _llm_cache.get_cached_analysis(key)
+    if cached is not None:
+        return cached["analysis"]
     chain = LLMChain(llm=OpenAI(temperature=0), prompt=signature_prompt)
-    return chain.run({"text": text})
+    result = chain.run({"text": text})
+    _llm_cache.cache_analysis(key, {"analysis": result})
+    return result
 
 #rewrite_with_signature
 def rewrite_with_signature(text: str, signature: str):
+    key = _content_hash(text, signature)
+    cached = _llm_cache.get_cached_evaluation(key)
+    if cached is not None:
+        return cached["rewritten"]
     chain = LLMChain(llm=OpenAI(temperature=0.7), prompt=rewrite_prompt)
-    return chain.run({"text": text, "signature": signature})
+    result = chain.run({"text": text, "signature": signature})
+    _llm_cache.cache_evaluation(key, {"rewritten": result})
+    return result
 
 #evaluate_tone
 def evaluate_tone(original: str, rewritten: str, signature: str):
     chain = LLMChain(llm=OpenAI(temperature=0), prompt=evaluation_prompt)
     return chain.run({"original_text": original, "rewritten_text": rewritten, "signature": signature})
 
+#analyze_tone_async
+async def analyze_tone_async(text: str):
+    """Async variant of analyze_tone that keeps the event loop free during the LLM round-trip"""
+    key = _content_hash(text)
+    cached = _llm_cache.get_cached_analysis(key)
+    if cached is not None:
+        return cached["analysis"]
+    chain = LLMChain(llm=OpenAI(temperature=0), prompt=signature_prompt)
+    result = await chain.arun({"text": text})
+    _llm_cache.cache_analysis(key, {"analysis": result})
+    return result
+
+#rewrite_with_signature_async
+async def rewrite_with_signature_async(text: str, signature: str):
+    """Async variant of rewrite_with_signature"""
+    key = _content_hash(text, signature)
+    cached = _llm_cache.get_cached_evaluation(key)
+    if cached is not None:
+        return cached["rewritten"]
+    chain = LLMChain(llm=OpenAI(temperature=0.7), prompt=rewrite_prompt)
+    result = await chain.arun({"text": text, "signature": signature})
+    _llm_cache.cache_evaluation(key, {"rewritten": result})
+    return result
+
+#evaluate_tone_async
+async def evaluate_tone_async(original: str, rewritten: str, signature: str):
+    """Async variant of evaluate_tone"""
+    chain = LLMChain(llm=OpenAI(temperature=0), prompt=evaluation_prompt)
+    return await chain.arun({"original_text": original, "rewritten_text": rewritten, "signature": signature})
+
+#analyze_tone_batch
+async def analyze_tone_batch(texts: List[str]):
+    """Analyze several texts in one batched LLM call, serving repeats from cache"""
+    keys = [_content_hash(text) for text in texts]
+    results = [None] * len(texts)
+    misses = []
+    for i, key in enumerate(keys):
+        cached = _llm_cache.get_cached_analysis(key)
+        if cached is not None:
+            results[i] = cached["analysis"]
+        else:
+            misses.append(i)
+
+    if misses:
+        chain = LLMChain(llm=OpenAI(temperature=0), prompt=signature_prompt)
+        fresh = await chain.aapply([{"text": texts[i]} for i in misses])
+        for i, result in zip(misses, fresh):
+            results[i] = result["text"]
+            _llm_cache.cache_analysis(keys[i], {"analysis": result["text"]})
+
+    return results
+
+#rewrite_with_signature_batch
+async def rewrite_with_signature_batch(items: List[tuple]):
+    """Rewrite several (text, signature) pairs in one batched LLM call, serving repeats from cache"""
+    keys = [_content_hash(text, signature) for text, signature in items]
+    results = [None] * len(items)
+    misses = []
+    for i, key in enumerate(keys):
+        cached = _llm_cache.get_cached_evaluation(key)
+        if cached is not None:
+            results[i] = cached["rewritten"]
+        else:
+            misses.append(i)
+
+    if misses:
+        chain = LLMChain(llm=OpenAI(temperature=0.7), prompt=rewrite_prompt)
+        fresh = await chain.aapply([
+            {"text": items[i][0], "signature": items[i][1]} for i in misses
+        ])
+        for i, result in zip(misses, fresh):
+            results[i] = result["text"]
+            _llm_cache.cache_evaluation(keys[i], {"rewritten": result["text"]})
+
+    return results
+
+#evaluate_tone_batch
+async def evaluate_tone_batch(items: List[tuple]):
+    """Evaluate several (original, rewritten, signature) triples in one batched LLM call"""
+    chain = LLMChain(llm=OpenAI(temperature=0), prompt=evaluation_prompt)
+    results = await chain.aapply([
+        {"original_text": original, "rewritten_text": rewritten, "signature": signature}
+        for original, rewritten, signature in items
+    ])
+    return [result["text"] for result in results]
+
 class WordDocumentLoader:
     """Custom loader for Word documents"""
     def __init__(self, file_path: str):
@@ -79,66 +191,119 @@ class WordDocumentLoader:
     def load(self) -> List[str]:
         """Load and extract text from a Word document"""
         doc = Document(self.file_path)
-        texts = []
-        
-        # Extract text from paragraphs
-        for para in doc.paragraphs:
-            if para.text.strip():  # Only add non-empty paragraphs
-                texts.append(para.text)
-        
-        # Extract text from tables
-        for table in doc.tables:
-            for row in table.rows:
-                for cell in row.cells:
-                    if cell.text.strip():  # Only add non-empty cells
-                        texts.append(cell.text)
-        
+
+        # Strip each element once and keep only non-empty text; the loops
+        # previously stripped a second time just for the emptiness check
+        texts = [text for para in doc.paragraphs if (text := para.text.strip())]
+        texts.extend(
+            text
+            for table in doc.tables
+            for row in table.rows
+            for cell in row.cells
+            if (text := cell.text.strip())
+        )
+
         return texts
 
+_CHROMA_DIR = "./chroma_db"
+
+def _content_id(file_path: str) -> str:
+    """Hash the file bytes so unchanged files map to the same collection"""
+    h = hashlib.blake2b(digest_size=16)
+    with open(file_path, "rb") as f:
+        while chunk := f.read(1 << 20):
+            h.update(chunk)
+    return h.hexdigest()
+
+def _existing_collection(collection_name: str, embeddings):
+    """Return the persisted vectorstore for this content, or None"""
+    vectorstore = Chroma(
+        collection_name=collection_name,
+        persist_directory=_CHROMA_DIR,
+        embedding_function=embeddings
+    )
+    if vectorstore._collection.count():
+        return vectorstore
+    return None
+
 def process_word_document(file_path: str):
     """Process a Word document and store it in the vector database for brand voice analysis."""
+    # Collections are keyed by file content, so re-processing an unchanged
+    # document reuses the stored embeddings instead of paying OpenAI again
+    collection_name = f"bv_{_content_id(file_path)}"
+    embeddings = OpenAIEmbeddings()
+    existing = _existing_collection(collection_name, embeddings)
+    if existing is not None:
+        return existing
+
     # Load the document
     loader = WordDocumentLoader(file_path)
     texts = loader.load()
-    
+
     # Split the text into chunks
     text_splitter = RecursiveCharacterTextSplitter(
         chunk_size=1000,
         chunk_overlap=200
     )
     documents = text_splitter.create_documents(texts)
-    
+
     # Create embeddings and store in Chroma
-    embeddings = OpenAIEmbeddings()
     vectorstore = Chroma.from_documents(
         documents=documents,
         embedding=embeddings,
-        persist_directory="./chroma_db"
+        collection_name=collection_name,
+        persist_directory=_CHROMA_DIR
     )
-    
+
     return vectorstore
 
+def build_word_document_collection(file_path: str) -> str:
+    """Embed a Word document and return its collection name.
+
+    Returns only the picklable name, so it is safe to run in a process
+    pool; vectorstores themselves hold sqlite connections and locks that
+    cannot cross the process boundary. Callers reopen the persisted
+    collection with open_collection.
+    """
+    process_word_document(file_path)
+    return f"bv_{_content_id(file_path)}"
+
+def open_collection(collection_name: str):
+    """Open a persisted Chroma collection by name"""
+    return Chroma(
+        collection_name=collection_name,
+        persist_directory=_CHROMA_DIR,
+        embedding_function=OpenAIEmbeddings()
+    )
+
 def process_document(file_path: str):
     """Process a document and store it in the vector database for brand voice analysis."""
+    # Same content-addressed short-circuit as process_word_document
+    collection_name = f"bv_{_content_id(file_path)}"
+    embeddings = OpenAIEmbeddings()
+    existing = _existing_collection(collection_name, embeddings)
+    if existing is not None:
+        return existing
+
     # Load the document
     loader = TextLoader(file_path)
     documents = loader.load()
-    
+
     # Split the text into chunks
     text_splitter = RecursiveCharacterTextSplitter(
         chunk_size=1000,
         chunk_overlap=200
     )
     texts = text_splitter.split_documents(documents)
-    
+
     # Create embeddings and store in Chroma
-    embeddings = OpenAIEmbeddings()
     vectorstore = Chroma.from_documents(
         documents=texts,
         embedding=embeddings,
-        persist_directory="./chroma_db"
+        collection_name=collection_name,
+        persist_directory=_CHROMA_DIR
     )
-    
+
     return vectorstore
 
 def find_similar_texts(text: str, vectorstore, k: int = 3):
@@ -157,8 +322,9 @@ def analyze_brand_voice(corpus_paths: list[str]):
         texts = vectorstore.get()
         all_texts.extend(texts)
     
-    # Combine all texts for analysis
-    combined_text = " ".join([doc.page_content for doc in all_texts])
+    # Combine all texts for analysis; the generator avoids materializing an
+    # intermediate list of every document's text before joining
+    combined_text = " ".join(doc.page_content for doc in all_texts)
     
     # Analyze the combined text to get a comprehensive brand voice signature
     return analyze_tone(combined_text)